@@ -22,8 +22,7 @@ provider_client = ProviderClient()
 
 def _to_connection_out(connection: Connection) -> ConnectionOut:
     data = ConnectionOut.model_validate(connection)
-    data.has_stored_api_key = bool(connection.api_key_encrypted)
-    return data
+    return data.model_copy(update={"has_stored_api_key": bool(connection.api_key_encrypted)})
 
 
 @router.get("", response_model=list[ConnectionOut])
@@ -1,18 +1,19 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.models import Car, Connection, JudgeResult, Metric, Output, RunItem, RunItemStatus
 from app.db.session import get_db
-from app.schemas import LeaderboardResponse, LeaderboardRow
+from app.schemas import LEADERBOARD_ROWS_ADAPTER, LeaderboardResponse, LeaderboardRow
 
 router = APIRouter(prefix="/api/leaderboard", tags=["leaderboard"])
 
 
 @router.get("", response_model=LeaderboardResponse)
-def leaderboard(db: Session = Depends(get_db)) -> LeaderboardResponse:
+def leaderboard(db: Session = Depends(get_db)) -> ORJSONResponse:
     stats: dict[int, dict[str, float | int]] = {}
     metrics_rows = db.execute(
         select(
@@ -159,4 +160,6 @@ def leaderboard(db: Session = Depends(get_db)) -> LeaderboardResponse:
         ),
         reverse=True,
     )
-    return LeaderboardResponse(rows=rows)
+    # The rows are already validated models; dump them once through the cached adapter and skip
+    # FastAPI's second validate/serialize pass over the response model.
+    return ORJSONResponse({"rows": LEADERBOARD_ROWS_ADAPTER.dump_python(rows, mode="json")})
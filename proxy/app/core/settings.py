@@ -18,6 +18,13 @@ class Settings(BaseSettings):
     telemetry_poll_interval_seconds: float = 0.4
     telemetry_heartbeat_seconds: float = 10.0
     tool_loop_limit: int = 3
+    # Upper bound on text json_validate / the fallback tool parser will decode (TOOL_JSON_MAX_CHARS).
+    tool_json_max_chars: int = 1 << 20
+    # Keep every streamed provider chunk on the output row; off by default to keep writes small.
+    persist_raw_provider_payload: bool = False
+    # Serve repeated identical race requests from an in-process cache for this many seconds; 0 disables it.
+    # Cache hits skip the provider, so their TTFT and latency do not measure the model.
+    provider_response_cache_ttl_seconds: float = 0.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,18 +1,74 @@
+import json
 from collections.abc import Generator
+from typing import Any
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.settings import get_settings
 
 settings = get_settings()
 
+
+def _async_database_url(database_url: str) -> URL:
+    url = make_url(database_url)
+    if url.drivername == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def _enable_sqlite_wal(dbapi_connection: Any, _connection_record: Any) -> None:
+    # WAL lets the API's readers run alongside the executor's writer.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
+def _json_serializer(value: Any) -> str:
+    # JSON columns (telemetry payloads, provider payloads, tool args) are written through orjson;
+    # values it rejects, such as integers wider than 64 bits, still go through the stdlib encoder.
+    try:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(value)
+
+
+def _json_deserializer(value: str | bytes) -> Any:
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        # Rows written by the stdlib encoder may contain NaN/Infinity, which orjson refuses.
+        return json.loads(value)
+
+
+_is_sqlite = settings.database_url.startswith("sqlite")
+
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    json_serializer=_json_serializer,
+    json_deserializer=_json_deserializer,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
+# The race executor runs on the event loop, so it gets its own pooled async engine.
+_async_url = _async_database_url(settings.database_url)
+async_engine = create_async_engine(
+    _async_url,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=_json_deserializer,
+    **({} if _async_url.database in (None, "", ":memory:") else {"pool_size": 10, "max_overflow": 20}),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if _is_sqlite:
+    event.listen(engine, "connect", _enable_sqlite_wal)
+    event.listen(async_engine.sync_engine, "connect", _enable_sqlite_wal)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
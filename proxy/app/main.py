@@ -4,12 +4,13 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api import cars, connections, health, leaderboard, provider_settings, runs, suites
 from app.core.settings import get_settings
 from app.db.base import Base
 from app.db.seeds import seed_all
-from app.db.session import SessionLocal, engine
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, engine
 from app.providers.adapters import ProviderClient
 from app.runs.executor import RaceExecutor
 
@@ -23,15 +24,18 @@ async def lifespan(app: FastAPI):
     with SessionLocal() as db:
         seed_all(db)
 
-    executor = RaceExecutor(session_factory=SessionLocal, provider_client=provider_client, settings=settings)
+    executor = RaceExecutor(session_factory=AsyncSessionLocal, provider_client=provider_client, settings=settings)
     executor.start()
     app.state.executor = executor
 
     yield
     await executor.stop()
+    await connections.provider_client.aclose()
+    await runs.provider_client.aclose()
+    await async_engine.dispose()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.app_name, lifespan=lifespan)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan, default_response_class=ORJSONResponse)
 
     app.add_middleware(
         CORSMiddleware,
@@ -1,41 +1,114 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import copy
 import os
 import time
-from collections import defaultdict
+from collections.abc import AsyncIterator
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
+import orjson
 
 from app.core.security import decrypt_secret
 from app.core.settings import Settings, get_settings
 from app.db.models import Connection, ConnectionType
+from app.providers.cache import ResponseCache, cache_key, cache_ttl
 from app.providers.normalize import provider_mode
 from app.providers.types import NormalizedChatRequest, ProviderResponse, TelemetryCallback, TokenCallback
 
 
+async def _aiter_frames(resp: httpx.Response) -> AsyncIterator[bytes]:
+    # Frame the raw byte stream on b"\n" instead of aiter_lines(), which decodes and copies every line as str.
+    buf = bytearray()
+    async for chunk in resp.aiter_bytes():
+        buf += chunk
+        start = 0
+        with memoryview(buf) as view:
+            while (end := buf.find(b"\n", start)) != -1:
+                line = view[start:end].tobytes()
+                start = end + 1
+                yield line[:-1] if line.endswith(b"\r") else line
+        del buf[:start]
+    if buf:
+        yield bytes(buf[:-1]) if buf.endswith(b"\r") else bytes(buf)
+
+
+class _TokenCoalescer:
+    # Joins deltas that arrive within a few ms of each other into one on_token call.
+    # The first delta is always forwarded immediately so TTFT is not skewed.
+    def __init__(self, on_token: TokenCallback, max_parts: int = 8, max_delay_s: float = 0.005) -> None:
+        self._on_token = on_token
+        self._max_parts = max_parts
+        self._max_delay_s = max_delay_s
+        self._pending: list[str] = []
+        self._last_flush = float("-inf")
+
+    async def push(self, text: str) -> None:
+        self._pending.append(text)
+        if len(self._pending) >= self._max_parts or time.perf_counter() - self._last_flush >= self._max_delay_s:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending.clear()
+            await self._on_token(text)
+        self._last_flush = time.perf_counter()
+
+
+def _copy_response(response: ProviderResponse) -> ProviderResponse:
+    return ProviderResponse(
+        text=response.text,
+        tool_calls=copy.deepcopy(response.tool_calls),
+        usage=copy.deepcopy(response.usage),
+        raw=copy.deepcopy(response.raw),
+    )
+
+
 class ProviderClient:
     def __init__(self, settings: Settings | None = None) -> None:
         self.settings = settings or get_settings()
+        self.response_cache = ResponseCache()
+        self._endpoints: dict[int, tuple[tuple[Any, ...], str, dict[str, str]]] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+
+    def _http_client(self) -> httpx.AsyncClient:
+        # One pooled keep-alive client per event loop, so repeat requests to a provider skip the
+        # TCP/TLS handshake. Timeouts are passed per request.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                http2=True,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
 
     async def discover_models(self, connection: Connection, timeout_ms: int = 8000) -> list[str]:
         timeout = timeout_ms / 1000.0
-        headers = self._headers_for(connection)
+        base_url, headers = self._endpoint_for(connection)
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                if connection.type == ConnectionType.OLLAMA:
-                    resp = await client.get(f"{connection.base_url.rstrip('/')}/api/tags", headers=headers)
-                    resp.raise_for_status()
-                    payload = resp.json()
-                    return [m.get("name", "") for m in payload.get("models", []) if m.get("name")]
-
-                path = self._models_path(connection)
-                resp = await client.get(f"{connection.base_url.rstrip('/')}{path}", headers=headers)
+            client = self._http_client()
+            if connection.type == ConnectionType.OLLAMA:
+                resp = await client.get(f"{base_url}/api/tags", headers=headers, timeout=timeout)
                 resp.raise_for_status()
                 payload = resp.json()
-                return self._extract_model_ids(payload)
+                return [m.get("name", "") for m in payload.get("models", []) if m.get("name")]
+
+            path = self._models_path(connection)
+            resp = await client.get(f"{base_url}{path}", headers=headers, timeout=timeout)
+            resp.raise_for_status()
+            payload = resp.json()
+            return self._extract_model_ids(payload)
         except (httpx.HTTPError, ValueError) as exc:
             raise RuntimeError(self._format_connection_error("Model discovery", connection, exc)) from exc
 
@@ -74,16 +147,39 @@ class ProviderClient:
         on_token: TokenCallback,
         on_telemetry: TelemetryCallback | None = None,
     ) -> ProviderResponse:
+        mode = provider_mode(connection.type)
+        ttl = cache_ttl(request)
+        key: str | None = None
+        if ttl is not None:
+            key = cache_key(connection, request)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                # Hand out a copy so callers can't mutate the cached entry, and replay the events a
+                # live call would have emitted so cached and uncached runs look the same.
+                response = _copy_response(cached)
+                if response.text:
+                    await on_token(response.text)
+                if mode not in ("ollama", "anthropic") and response.tool_calls and on_telemetry:
+                    await on_telemetry(
+                        "tool.call.detected",
+                        {"count": len(response.tool_calls), "tool_calls": copy.deepcopy(response.tool_calls)},
+                    )
+                return response
+
         try:
-            mode = provider_mode(connection.type)
             if mode == "ollama":
-                return await self._generate_ollama(connection, request, timeout_ms, on_token)
-            if mode == "anthropic":
-                return await self._generate_anthropic(connection, request, timeout_ms, on_token)
-            return await self._generate_openai_compat(connection, request, timeout_ms, on_token, on_telemetry)
+                response = await self._generate_ollama(connection, request, timeout_ms, on_token)
+            elif mode == "anthropic":
+                response = await self._generate_anthropic(connection, request, timeout_ms, on_token)
+            else:
+                response = await self._generate_openai_compat(connection, request, timeout_ms, on_token, on_telemetry)
         except (httpx.HTTPError, ValueError) as exc:
             raise RuntimeError(self._format_connection_error("Generation", connection, exc)) from exc
 
+        if key is not None and ttl is not None:
+            self.response_cache.set(key, _copy_response(response), ttl)
+        return response
+
     async def _generate_openai_compat(
         self,
         connection: Connection,
@@ -92,7 +188,7 @@ class ProviderClient:
         on_token: TokenCallback,
         on_telemetry: TelemetryCallback | None,
     ) -> ProviderResponse:
-        headers = self._headers_for(connection)
+        base_url, headers = self._endpoint_for(connection)
         payload: dict[str, Any] = {
             "model": request.model,
             "messages": [self._to_openai_message(msg) for msg in request.messages],
@@ -114,58 +210,78 @@ class ProviderClient:
         text_chunks: list[str] = []
         raw_chunks: list[dict[str, Any]] = []
         usage: dict[str, Any] = {}
-        tool_fragments: dict[int, dict[str, str]] = defaultdict(lambda: {"id": "", "name": "", "arguments": ""})
+        tokens = _TokenCoalescer(on_token)
+        tool_ids: list[str] = []
+        tool_names: list[str] = []
+        tool_arg_parts: list[list[str]] = []
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
+        # Flush on the way out too, so a stream that fails midway still delivers its tail.
+        try:
+            client = self._http_client()
             async with client.stream(
                 "POST",
-                f"{connection.base_url.rstrip('/')}{self._chat_completions_path(connection)}",
+                f"{base_url}{self._chat_completions_path(connection)}",
                 headers=headers,
                 json=payload,
+                timeout=timeout,
             ) as resp:
                 resp.raise_for_status()
 
-                async for line in resp.aiter_lines():
-                    if not line or not line.startswith("data:"):
+                async for line in _aiter_frames(resp):
+                    if not line.startswith(b"data:"):
                         continue
-                    data = line[5:].strip()
-                    if data == "[DONE]":
+                    data = line[6:] if line[5:6] == b" " else line[5:]
+                    if data == b"[DONE]":
                         break
-                    chunk = json.loads(data)
+                    chunk = orjson.loads(data)
                     raw_chunks.append(chunk)
 
-                    if chunk.get("usage"):
-                        usage = chunk["usage"]
+                    chunk_usage = chunk.get("usage")
+                    if chunk_usage:
+                        usage = chunk_usage
 
-                    choices = chunk.get("choices", [])
-                    if not choices:
+                    # Nearly every chunk has choices[0].delta; only the usage trailer and malformed frames miss it.
+                    try:
+                        delta = chunk["choices"][0]["delta"]
+                        content = delta.get("content")
+                    except (KeyError, IndexError, TypeError, AttributeError):
                         continue
-                    delta = choices[0].get("delta", {})
-                    content = delta.get("content")
                     if content:
                         text_chunks.append(content)
-                        await on_token(content)
+                        await tokens.push(content)
 
-                    for tc in delta.get("tool_calls", []) or []:
+                    tool_deltas = delta.get("tool_calls")
+                    if not tool_deltas:
+                        continue
+                    for tc in tool_deltas:
                         idx = tc.get("index", 0)
-                        fragment = tool_fragments[idx]
-                        fragment["id"] = tc.get("id") or fragment["id"]
+                        while len(tool_ids) <= idx:
+                            tool_ids.append("")
+                            tool_names.append("")
+                            tool_arg_parts.append([])
+                        if tc.get("id"):
+                            tool_ids[idx] = tc["id"]
                         func = tc.get("function", {})
-                        fragment["name"] = func.get("name") or fragment["name"]
-                        fragment["arguments"] += func.get("arguments") or ""
+                        if func.get("name"):
+                            tool_names[idx] = func["name"]
+                        if func.get("arguments"):
+                            tool_arg_parts[idx].append(func["arguments"])
+        finally:
+            await tokens.flush()
 
         tool_calls = []
-        for fragment in tool_fragments.values():
-            if not fragment["name"]:
+        for idx, name in enumerate(tool_names):
+            if not name:
                 continue
+            arguments = "".join(tool_arg_parts[idx])
             try:
-                parsed_args = json.loads(fragment["arguments"] or "{}")
-            except json.JSONDecodeError:
-                parsed_args = {"raw": fragment["arguments"]}
+                parsed_args = orjson.loads(arguments or "{}")
+            except orjson.JSONDecodeError:
+                parsed_args = {"raw": arguments}
             tool_calls.append(
                 {
-                    "id": fragment["id"] or f"call_{len(tool_calls) + 1}",
-                    "name": fragment["name"],
+                    "id": tool_ids[idx] or f"call_{len(tool_calls) + 1}",
+                    "name": name,
                     "arguments": parsed_args,
                 }
             )
@@ -191,7 +307,7 @@ class ProviderClient:
         timeout_ms: int,
         on_token: TokenCallback,
     ) -> ProviderResponse:
-        headers = self._headers_for(connection)
+        base_url, headers = self._endpoint_for(connection)
         system_messages: list[str] = []
         messages: list[dict[str, Any]] = []
         for msg in request.messages:
@@ -219,30 +335,31 @@ class ProviderClient:
         text_chunks: list[str] = []
         raw_chunks: list[dict[str, Any]] = []
         usage: dict[str, Any] = {}
+        tokens = _TokenCoalescer(on_token)
         current_event = ""
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
+        try:
+            client = self._http_client()
             async with client.stream(
                 "POST",
-                f"{connection.base_url.rstrip('/')}/v1/messages",
+                f"{base_url}/v1/messages",
                 headers=headers,
                 json=payload,
+                timeout=timeout,
             ) as resp:
                 resp.raise_for_status()
-                async for line in resp.aiter_lines():
-                    if not line:
-                        continue
-                    if line.startswith("event:"):
-                        current_event = line[6:].strip()
+                async for line in _aiter_frames(resp):
+                    if line.startswith(b"event:"):
+                        current_event = line[6:].strip().decode()
                         continue
-                    if not line.startswith("data:"):
+                    if not line.startswith(b"data:"):
                         continue
-                    data = line[5:].strip()
-                    if data == "[DONE]":
+                    data = line[6:] if line[5:6] == b" " else line[5:]
+                    if data == b"[DONE]":
                         break
                     try:
-                        chunk = json.loads(data)
-                    except json.JSONDecodeError:
+                        chunk = orjson.loads(data)
+                    except orjson.JSONDecodeError:
                         continue
                     raw_chunks.append({"event": current_event, "data": chunk})
 
@@ -256,7 +373,9 @@ class ProviderClient:
                         text = (chunk.get("delta") or {}).get("text")
                         if text:
                             text_chunks.append(text)
-                            await on_token(text)
+                            await tokens.push(text)
+        finally:
+            await tokens.flush()
 
         text = "".join(text_chunks)
         if not usage:
@@ -276,7 +395,7 @@ class ProviderClient:
         timeout_ms: int,
         on_token: TokenCallback,
     ) -> ProviderResponse:
-        headers = self._headers_for(connection)
+        base_url, headers = self._endpoint_for(connection)
         payload: dict[str, Any] = {
             "model": request.model,
             "stream": True,
@@ -296,27 +415,30 @@ class ProviderClient:
         text_chunks: list[str] = []
         raw_chunks: list[dict[str, Any]] = []
         usage: dict[str, Any] = {}
+        tokens = _TokenCoalescer(on_token)
         tool_calls: list[dict[str, Any]] = []
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
+        try:
+            client = self._http_client()
             async with client.stream(
                 "POST",
-                f"{connection.base_url.rstrip('/')}/api/chat",
+                f"{base_url}/api/chat",
                 headers=headers,
                 json=payload,
+                timeout=timeout,
             ) as resp:
                 resp.raise_for_status()
-                async for line in resp.aiter_lines():
+                async for line in _aiter_frames(resp):
                     if not line:
                         continue
-                    chunk = json.loads(line)
+                    chunk = orjson.loads(line)
                     raw_chunks.append(chunk)
 
                     message = chunk.get("message", {})
                     content = message.get("content")
                     if content:
                         text_chunks.append(content)
-                        await on_token(content)
+                        await tokens.push(content)
 
                     for tool in message.get("tool_calls", []) or []:
                         fn = tool.get("function", {})
@@ -334,6 +456,8 @@ class ProviderClient:
                             "prompt_tokens": chunk.get("prompt_eval_count"),
                             "estimated": chunk.get("eval_count") is None,
                         }
+        finally:
+            await tokens.flush()
 
         return ProviderResponse(
             text="".join(text_chunks),
@@ -355,6 +479,27 @@ class ProviderClient:
                 return env_value, "env_var"
         return None, "none"
 
+    def _endpoint_for(self, connection: Connection) -> tuple[str, dict[str, str]]:
+        # Memoize the normalized base URL and auth headers (key decryption, env lookups) per connection,
+        # rebuilding them whenever any field they are derived from changes.
+        fingerprint = (
+            connection.type,
+            connection.base_url,
+            getattr(connection, "api_key_encrypted", None),
+            getattr(connection, "api_key_env_var", None),
+            getattr(connection, "updated_at", None),
+        )
+        connection_id = getattr(connection, "id", None)
+        cached = self._endpoints.get(connection_id) if connection_id is not None else None
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1], cached[2]
+
+        base_url = connection.base_url.rstrip("/")
+        headers = self._headers_for(connection)
+        if connection_id is not None:
+            self._endpoints[connection_id] = (fingerprint, base_url, headers)
+        return base_url, headers
+
     def _headers_for(self, connection: Connection) -> dict[str, str]:
         headers: dict[str, str] = {}
         api_key, _source = self._resolve_api_key(connection)
@@ -499,12 +644,9 @@ class ProviderClient:
         return "Tip: stored API key exists. Verify the key value and provider account scope."
 
     def _to_openai_message(self, msg: Any) -> dict[str, Any]:
-        payload: dict[str, Any] = {"role": msg.role}
-        if msg.role == "tool":
-            payload["tool_call_id"] = msg.tool_call_id
-            payload["name"] = msg.name
-        payload["content"] = msg.content
-        return payload
+        if msg.role != "tool":
+            return {"role": msg.role, "content": msg.content}
+        return {"role": msg.role, "tool_call_id": msg.tool_call_id, "name": msg.name, "content": msg.content}
 
     def _to_ollama_message(self, msg: Any) -> dict[str, Any]:
         return {"role": msg.role, "content": msg.content}
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+
+from app.providers.types import NormalizedChatRequest, ProviderResponse
+
+DEFAULT_CACHE_TTL_SECONDS = 300
+
+
+class ResponseCache:
+    # In-process LRU of completed provider responses with a per-entry TTL.
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, ProviderResponse]] = OrderedDict()
+
+    def get(self, key: str) -> ProviderResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def set(self, key: str, response: ProviderResponse, ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def cache_ttl(request: NormalizedChatRequest) -> float | None:
+    # Requests opt in with metadata {"cache": {"type": "exact_match", "ttl": <seconds>}}.
+    policy = request.metadata.get("cache")
+    if not isinstance(policy, dict) or policy.get("type") != "exact_match":
+        return None
+    try:
+        ttl = float(policy.get("ttl", DEFAULT_CACHE_TTL_SECONDS))
+    except (TypeError, ValueError):
+        return None
+    return ttl if ttl > 0 else None
+
+
+def cache_key(connection: Any, request: NormalizedChatRequest) -> str:
+    payload = {
+        "connection": [connection.id, connection.type, connection.base_url],
+        "model": request.model,
+        "messages": [[m.role, m.content, m.tool_call_id, m.name] for m in request.messages],
+        "temperature": request.temperature,
+        "top_p": request.top_p,
+        "max_tokens": request.max_tokens,
+        "seed": request.seed,
+        "stop": request.stop,
+        "tools": request.tools,
+        "tool_choice": request.tool_choice,
+    }
+    encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from typing import Any
+
 from app.db.models import Car, Connection, ConnectionType, TestCase
-from app.providers.types import NormalizedChatRequest, NormalizedMessage
+from app.providers.types import ConnectionContext, NormalizedChatRequest, NormalizedMessage
 
 
 def build_messages(test_case: TestCase) -> list[NormalizedMessage]:
@@ -12,7 +14,30 @@ def build_messages(test_case: TestCase) -> list[NormalizedMessage]:
     return messages
 
 
-def build_request(connection: Connection, car: Car, test_case: TestCase) -> NormalizedChatRequest:
+def build_connection_context(connection: Connection) -> ConnectionContext:
+    return ConnectionContext(
+        id=connection.id,
+        type=connection.type,
+        base_url=connection.base_url,
+        api_key_env_var=connection.api_key_env_var,
+        api_key_encrypted=connection.api_key_encrypted,
+    )
+
+
+def build_request(
+    connection: Connection | ConnectionContext,
+    car: Car,
+    test_case: TestCase,
+    cache_ttl_seconds: float = 0.0,
+) -> NormalizedChatRequest:
+    metadata: dict[str, Any] = {
+        "connection_type": connection.type.value,
+        "connection_id": connection.id,
+        "car_id": car.id,
+        "test_id": test_case.id,
+    }
+    if cache_ttl_seconds > 0:
+        metadata["cache"] = {"type": "exact_match", "ttl": cache_ttl_seconds}
     return NormalizedChatRequest(
         model=car.model_name,
         messages=build_messages(test_case),
@@ -23,18 +48,15 @@ def build_request(connection: Connection, car: Car, test_case: TestCase) -> Norm
         seed=car.seed,
         tools=test_case.tools_schema_json,
         stream=True,
-        metadata={
-            "connection_type": connection.type.value,
-            "connection_id": connection.id,
-            "car_id": car.id,
-            "test_id": test_case.id,
-        },
+        metadata=metadata,
     )
 
 
+_PROVIDER_MODES: dict[ConnectionType, str] = {
+    ConnectionType.OLLAMA: "ollama",
+    ConnectionType.ANTHROPIC: "anthropic",
+}
+
+
 def provider_mode(connection_type: ConnectionType) -> str:
-    if connection_type == ConnectionType.OLLAMA:
-        return "ollama"
-    if connection_type == ConnectionType.ANTHROPIC:
-        return "anthropic"
-    return "openai_compat"
+    return _PROVIDER_MODES.get(connection_type, "openai_compat")
@@ -3,8 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Awaitable, Callable
 
+from app.db.models import ConnectionType
 
-@dataclass
+
+@dataclass(slots=True)
 class NormalizedMessage:
     role: str
     content: str
@@ -12,7 +14,7 @@ class NormalizedMessage:
     name: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class NormalizedChatRequest:
     model: str
     messages: list[NormalizedMessage]
@@ -27,14 +29,24 @@ class NormalizedChatRequest:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class ConnectionContext:
+    # Detached snapshot of the Connection fields the provider client reads.
+    id: int
+    type: ConnectionType
+    base_url: str
+    api_key_env_var: str | None = None
+    api_key_encrypted: str | None = None
+
+
+@dataclass(slots=True)
 class ToolCallFragment:
     id: str
     name: str
     arguments: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderResponse:
     text: str
     tool_calls: list[dict[str, Any]]
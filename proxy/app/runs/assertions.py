@@ -1,10 +1,30 @@
 from __future__ import annotations
 
 import re
-from typing import Any
+from typing import Any, Callable
 
 
-def _check_max_words(expected: str, output_text: str) -> tuple[bool, str]:
+def _check_contains(expected: str, output_text: str, output_text_lower: str) -> tuple[bool, str]:
+    passed = expected in output_text
+    return passed, f"contains={passed}"
+
+
+def _check_icontains(expected: str, output_text: str, output_text_lower: str) -> tuple[bool, str]:
+    passed = expected.lower() in output_text_lower
+    return passed, f"icontains={passed}"
+
+
+def _check_not_contains(expected: str, output_text: str, output_text_lower: str) -> tuple[bool, str]:
+    passed = expected not in output_text
+    return passed, f"not_contains={passed}"
+
+
+def _check_regex(expected: str, output_text: str, output_text_lower: str) -> tuple[bool, str]:
+    passed = bool(re.search(expected, output_text, flags=re.MULTILINE))
+    return passed, f"regex_match={passed}"
+
+
+def _check_max_words(expected: str, output_text: str, output_text_lower: str) -> tuple[bool, str]:
     try:
         max_words = int(expected.strip())
     except ValueError:
@@ -13,6 +33,15 @@ def _check_max_words(expected: str, output_text: str) -> tuple[bool, str]:
     return words <= max_words, f"words={words}, limit={max_words}"
 
 
+_CHECKS: dict[str, Callable[[str, str, str], tuple[bool, str]]] = {
+    "contains": _check_contains,
+    "icontains": _check_icontains,
+    "not_contains": _check_not_contains,
+    "regex": _check_regex,
+    "max_words": _check_max_words,
+}
+
+
 def _parse_constraints(raw_constraints: str | None) -> list[tuple[str, str]]:
     if not raw_constraints:
         return []
@@ -31,28 +60,15 @@ def evaluate_expected_constraints(raw_constraints: str | None, output_text: str)
     if not checks:
         return {"total": 0, "passed": 0, "results": []}
 
+    # Lowercase the output once, and only when an icontains check needs it.
+    output_text_lower = output_text.lower() if any(check_type == "icontains" for check_type, _ in checks) else ""
     results: list[dict[str, Any]] = []
     for check_type, expected in checks:
-        passed = True
-        detail = ""
-
-        if check_type == "contains":
-            passed = expected in output_text
-            detail = f"contains={passed}"
-        elif check_type == "icontains":
-            passed = expected.lower() in output_text.lower()
-            detail = f"icontains={passed}"
-        elif check_type == "not_contains":
-            passed = expected not in output_text
-            detail = f"not_contains={passed}"
-        elif check_type == "regex":
-            passed = bool(re.search(expected, output_text, flags=re.MULTILINE))
-            detail = f"regex_match={passed}"
-        elif check_type == "max_words":
-            passed, detail = _check_max_words(expected, output_text)
+        check = _CHECKS.get(check_type)
+        if check is None:
+            passed, detail = False, f"unsupported check: {check_type}"
         else:
-            detail = f"unsupported check: {check_type}"
-            passed = False
+            passed, detail = check(expected, output_text, output_text_lower)
 
         results.append(
             {
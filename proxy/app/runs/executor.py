@@ -1,14 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import time
+from dataclasses import dataclass, replace
 from datetime import datetime
-from types import SimpleNamespace
-from typing import Any
+from typing import Any, Callable
 
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, sessionmaker
+import orjson
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.settings import Settings
 from app.db.models import (
@@ -26,18 +26,57 @@ from app.db.models import (
     ToolCall,
 )
 from app.providers.adapters import ProviderClient
-from app.providers.normalize import build_request
-from app.providers.types import NormalizedChatRequest, NormalizedMessage
+from app.providers.normalize import build_connection_context, build_request
+from app.providers.types import ConnectionContext, NormalizedChatRequest, NormalizedMessage
 from app.runs.assertions import evaluate_expected_constraints
 from app.runs.metrics import compute_metrics
-from app.runs.telemetry import emit_event
+from app.runs.telemetry import TelemetryBuffer
 from app.runs.tools import ToolExecutionError, execute_tool, parse_fallback_tool_command
 
 
+@dataclass(frozen=True)
+class ItemContext:
+    # Everything an attempt needs, resolved once per run item so retries do not reload it.
+    run_id: int
+    run_item_id: int
+    test_id: int
+    car_id: int
+    connection_context: ConnectionContext
+    request_template: NormalizedChatRequest
+    expected_constraints: str | None
+    timeout_ms: int
+    max_in_flight: int
+    semaphore_key: str
+    retries: int
+    backoff: float
+
+
+class TokenBatcher:
+    # Groups streamed tokens into one token.delta event per batch; the first token is emitted
+    # right away so the live output starts as soon as the model does.
+    def __init__(self, emit: Callable[[str], None], max_tokens: int = 16, max_delay_ms: float = 50.0) -> None:
+        self._emit = emit
+        self._max_tokens = max_tokens
+        self._max_delay_s = max_delay_ms / 1000.0
+        self._parts: list[str] = []
+        self._last_flush = float("-inf")
+
+    def add(self, token: str) -> None:
+        self._parts.append(token)
+        if len(self._parts) >= self._max_tokens or time.perf_counter() - self._last_flush >= self._max_delay_s:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            self._emit("".join(self._parts))
+            self._parts.clear()
+        self._last_flush = time.perf_counter()
+
+
 class RaceExecutor:
     def __init__(
         self,
-        session_factory: sessionmaker[Session],
+        session_factory: async_sessionmaker[AsyncSession],
         provider_client: ProviderClient,
         settings: Settings,
     ) -> None:
@@ -47,8 +86,11 @@ class RaceExecutor:
         self._queue: asyncio.Queue[int] = asyncio.Queue()
         self._worker_task: asyncio.Task[None] | None = None
         self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._semaphore_lock = asyncio.Lock()
+        self.telemetry = TelemetryBuffer(session_factory)
 
     def start(self) -> None:
+        self.telemetry.start()
         if self._worker_task is None:
             self._worker_task = asyncio.create_task(self._worker_loop())
 
@@ -60,6 +102,8 @@ class RaceExecutor:
             except asyncio.CancelledError:
                 pass
             self._worker_task = None
+        await self.telemetry.stop()
+        await self.provider_client.aclose()
 
     async def enqueue(self, run_id: int) -> None:
         await self._queue.put(run_id)
@@ -70,110 +114,165 @@ class RaceExecutor:
             try:
                 await self._execute_run(run_id)
             except Exception as exc:  # noqa: BLE001
-                with self.session_factory() as db:
-                    run = db.get(Run, run_id)
+                async with self.session_factory() as db:
+                    run = await db.get(Run, run_id)
                     if run:
                         run.status = RunStatus.FAILED
                         run.finished_at = datetime.utcnow()
-                        db.commit()
-                        emit_event(db, run_id, "run.completed", {"status": "FAILED", "error": str(exc)})
+                        self.telemetry.enqueue(run_id, "run.completed", {"status": "FAILED", "error": str(exc)})
+                        await self.telemetry.flush(db)
+                        await db.commit()
             finally:
+                self.telemetry.release_run(run_id)
                 self._queue.task_done()
 
     async def _execute_run(self, run_id: int) -> None:
-        with self.session_factory() as db:
-            run = db.get(Run, run_id)
+        async with self.session_factory() as db:
+            run = await db.get(Run, run_id)
             if not run:
                 return
             run.status = RunStatus.RUNNING
             run.started_at = datetime.utcnow()
-            db.commit()
-            emit_event(db, run_id, "run.started", {"status": run.status.value})
+            await self.telemetry.open_run(db, run_id)
+            await db.commit()
+            self.telemetry.enqueue(run_id, "run.started", {"status": run.status.value})
 
-        with self.session_factory() as db:
-            run = db.get(Run, run_id)
+        async with self.session_factory() as db:
+            run = await db.get(Run, run_id)
             if not run:
                 return
-            suite = db.get(Suite, run.suite_id)
+            suite = await db.get(Suite, run.suite_id)
             if not suite:
                 raise RuntimeError(f"Suite not found for run {run_id}")
             tests = list(
-                db.scalars(
+                await db.scalars(
                     select(TestCase).where(TestCase.suite_id == suite.id).order_by(TestCase.order_index.asc())
                 )
             )
-            cars = list(db.scalars(select(Car).where(Car.id.in_(run.selected_car_ids_json))))
+            cars = list(await db.scalars(select(Car).where(Car.id.in_(run.selected_car_ids_json))))
             car_by_id = {car.id: car for car in cars}
             ordered_cars = [car_by_id[cid] for cid in run.selected_car_ids_json if cid in car_by_id]
+            if not tests or not ordered_cars:
+                # Nothing to race: finish now instead of loading connections and counting zero items.
+                run.status = RunStatus.COMPLETED
+                run.finished_at = datetime.utcnow()
+                self.telemetry.enqueue(run_id, "run.completed", {"status": run.status.value})
+                await self.telemetry.flush(db)
+                await db.commit()
+                return
+
+            # Resolve every connection and provider setting the run needs up front instead of per item.
+            connections_by_id = {
+                connection.id: connection
+                for connection in await db.scalars(
+                    select(Connection).where(Connection.id.in_({car.connection_id for car in ordered_cars}))
+                )
+            }
+            # Detached copies of the connection fields, built once and shared by every item and attempt.
+            contexts_by_connection_id = {
+                connection.id: build_connection_context(connection) for connection in connections_by_id.values()
+            }
+            provider_types = {connection.type for connection in connections_by_id.values()}
+            settings_by_type = {
+                row.provider_type: row
+                for row in await db.scalars(select(ProviderSettings).where(ProviderSettings.provider_type.in_(provider_types)))
+            }
+            missing_types = provider_types - settings_by_type.keys()
+            if missing_types:
+                for provider_type in missing_types:
+                    settings_by_type[provider_type] = ProviderSettings(provider_type=provider_type)
+                    db.add(settings_by_type[provider_type])
+                await db.commit()
+                for provider_type in missing_types:
+                    await db.refresh(settings_by_type[provider_type])
+
+            item_ids_by_key = {
+                (test_id, car_id): item_id
+                for item_id, test_id, car_id in await db.execute(
+                    select(RunItem.id, RunItem.test_id, RunItem.car_id).where(RunItem.run_id == run_id)
+                )
+            }
 
         for test_case in tests:
+            # Cars race each other on the same test; per-provider semaphores still cap in-flight requests.
+            item_jobs = []
             for car in ordered_cars:
-                with self.session_factory() as db:
-                    run_item = db.scalar(
-                        select(RunItem).where(
-                            RunItem.run_id == run_id,
-                            RunItem.test_id == test_case.id,
-                            RunItem.car_id == car.id,
+                run_item_id = item_ids_by_key.get((test_case.id, car.id))
+                if run_item_id is None:
+                    continue
+                connection_context = contexts_by_connection_id.get(car.connection_id)
+                if not connection_context:
+                    async with self.session_factory() as db:
+                        await db.execute(
+                            update(RunItem)
+                            .where(RunItem.id == run_item_id)
+                            .values(status=RunItemStatus.FAILED, error_message="Connection missing")
                         )
+                        await db.commit()
+                    self.telemetry.enqueue(
+                        run_id,
+                        "item.error",
+                        {"error": "Connection missing", "car_id": car.id, "test_id": test_case.id},
+                        run_item_id=run_item_id,
                     )
-                    if not run_item:
-                        continue
-                    connection = db.get(Connection, car.connection_id)
-                    if not connection:
-                        run_item.status = RunItemStatus.FAILED
-                        run_item.error_message = "Connection missing"
-                        db.commit()
-                        emit_event(
-                            db,
-                            run_id,
-                            "item.error",
-                            {"error": "Connection missing", "car_id": car.id, "test_id": test_case.id},
-                            run_item_id=run_item.id,
-                        )
-                        continue
+                    continue
 
-                await self._execute_item(run_id, run_item.id, test_case.id, car.id, connection.id)
+                item_jobs.append(
+                    self._execute_item(
+                        run_id,
+                        run_item_id,
+                        test_case,
+                        car,
+                        connection_context,
+                        settings_by_type[connection_context.type],
+                    )
+                )
 
-        with self.session_factory() as db:
-            run = db.get(Run, run_id)
+            results = await asyncio.gather(*item_jobs, return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+        async with self.session_factory() as db:
+            run = await db.get(Run, run_id)
             if not run:
                 return
-            total_items = db.scalar(select(func.count(RunItem.id)).where(RunItem.run_id == run_id)) or 0
-            failed_items = db.scalar(
-                select(func.count(RunItem.id)).where(
-                    RunItem.run_id == run_id,
-                    RunItem.status == RunItemStatus.FAILED,
-                )
-            ) or 0
+            totals = await db.execute(
+                select(
+                    func.count(RunItem.id),
+                    func.coalesce(func.sum(case((RunItem.status == RunItemStatus.FAILED, 1), else_=0)), 0),
+                ).where(RunItem.run_id == run_id)
+            )
+            total_items, failed_items = totals.one()
             run.status = RunStatus.FAILED if total_items > 0 and failed_items == total_items else RunStatus.COMPLETED
             run.finished_at = datetime.utcnow()
-            db.commit()
-            emit_event(db, run_id, "run.completed", {"status": run.status.value})
-
-    async def _execute_item(self, run_id: int, run_item_id: int, test_id: int, car_id: int, connection_id: int) -> None:
-        with self.session_factory() as db:
-            run_item = db.get(RunItem, run_item_id)
-            test_case = db.get(TestCase, test_id)
-            car = db.get(Car, car_id)
-            connection = db.get(Connection, connection_id)
-            if not run_item or not test_case or not car or not connection:
-                return
+            self.telemetry.enqueue(run_id, "run.completed", {"status": run.status.value})
+            # Commit the final status together with every outstanding event, so stream readers
+            # never observe a finished run whose run.completed event is still buffered.
+            await self.telemetry.flush(db)
+            await db.commit()
 
-            provider_settings = db.scalar(
-                select(ProviderSettings).where(ProviderSettings.provider_type == connection.type)
-            )
-            if not provider_settings:
-                provider_settings = ProviderSettings(provider_type=connection.type)
-                db.add(provider_settings)
-                db.commit()
-                db.refresh(provider_settings)
+    async def _execute_item(
+        self,
+        run_id: int,
+        run_item_id: int,
+        test_case: TestCase,
+        car: Car,
+        connection_context: ConnectionContext,
+        provider_settings: ProviderSettings,
+    ) -> None:
+        test_id = test_case.id
+        car_id = car.id
+        async with self.session_factory() as db:
+            run_item = await db.get(RunItem, run_item_id)
+            if not run_item:
+                return
 
             run_item.status = RunItemStatus.RUNNING
             run_item.started_at = datetime.utcnow()
-            db.commit()
+            await db.commit()
 
-            emit_event(
-                db,
+            self.telemetry.enqueue(
                 run_id,
                 "item.started",
                 {"run_item_id": run_item_id, "car_id": car_id, "test_id": test_id},
@@ -181,116 +280,115 @@ class RaceExecutor:
             )
 
             retries = max(0, provider_settings.retry_count)
-            backoff = max(0, provider_settings.retry_backoff_ms) / 1000.0
+            ctx = ItemContext(
+                run_id=run_id,
+                run_item_id=run_item_id,
+                test_id=test_id,
+                car_id=car_id,
+                connection_context=connection_context,
+                request_template=build_request(
+                    connection_context,
+                    car,
+                    test_case,
+                    cache_ttl_seconds=self.settings.provider_response_cache_ttl_seconds,
+                ),
+                expected_constraints=test_case.expected_constraints,
+                timeout_ms=provider_settings.timeout_ms,
+                max_in_flight=provider_settings.max_in_flight,
+                semaphore_key=connection_context.type.value,
+                retries=retries,
+                backoff=max(0, provider_settings.retry_backoff_ms) / 1000.0,
+            )
 
         last_error: str | None = None
         for attempt in range(retries + 1):
             try:
-                await self._execute_item_attempt(run_id, run_item_id, attempt + 1)
+                await self._execute_item_attempt(ctx, attempt + 1)
                 return
             except Exception as exc:  # noqa: BLE001
                 last_error = str(exc)
-                with self.session_factory() as db:
-                    emit_event(
-                        db,
-                        run_id,
-                        "item.error",
-                        {
-                            "run_item_id": run_item_id,
-                            "attempt": attempt + 1,
-                            "error": last_error,
-                            "retrying": attempt < retries,
-                        },
-                        run_item_id=run_item_id,
-                    )
+                self.telemetry.enqueue(
+                    run_id,
+                    "item.error",
+                    {
+                        "run_item_id": run_item_id,
+                        "attempt": attempt + 1,
+                        "error": last_error,
+                        "retrying": attempt < retries,
+                    },
+                    run_item_id=run_item_id,
+                )
                 if attempt < retries:
-                    await asyncio.sleep(backoff)
+                    await asyncio.sleep(ctx.backoff)
 
-        with self.session_factory() as db:
-            run_item = db.get(RunItem, run_item_id)
+        async with self.session_factory() as db:
+            run_item = await db.get(RunItem, run_item_id)
             if not run_item:
                 return
+            run_item.attempt_count = retries + 1
             run_item.status = RunItemStatus.FAILED
             run_item.error_message = last_error
             run_item.finished_at = datetime.utcnow()
-            db.commit()
+            await db.commit()
 
-            metric = db.scalar(select(Metric).where(Metric.run_item_id == run_item_id))
+            metric = await db.scalar(select(Metric).where(Metric.run_item_id == run_item_id))
             if not metric:
                 db.add(Metric(run_item_id=run_item_id, error_flag=True, output_tokens_estimated=True))
-                db.commit()
+                await db.commit()
 
-            emit_event(
-                db,
+            self.telemetry.enqueue(
                 run_id,
                 "item.completed",
                 {"run_item_id": run_item_id, "status": RunItemStatus.FAILED.value},
                 run_item_id=run_item_id,
             )
 
-    async def _execute_item_attempt(self, run_id: int, run_item_id: int, attempt_number: int) -> None:
-        with self.session_factory() as db:
-            run_item = db.get(RunItem, run_item_id)
-            if not run_item:
-                return
-            test_case = db.get(TestCase, run_item.test_id)
-            car = db.get(Car, run_item.car_id)
-            if not test_case or not car:
-                raise RuntimeError("Missing test or car")
-            connection = db.get(Connection, car.connection_id)
-            if not connection:
-                raise RuntimeError("Missing connection")
-            provider_settings = db.scalar(
-                select(ProviderSettings).where(ProviderSettings.provider_type == connection.type)
-            )
-            if not provider_settings:
-                raise RuntimeError("Missing provider settings")
-
-            connection_context = SimpleNamespace(
-                id=connection.id,
-                type=connection.type,
-                base_url=connection.base_url,
-                api_key_env_var=connection.api_key_env_var,
-                api_key_encrypted=connection.api_key_encrypted,
-            )
-            semaphore_key = connection.type.value
-            max_in_flight = provider_settings.max_in_flight
-            timeout_ms = provider_settings.timeout_ms
-
-            run_item.attempt_count = attempt_number
-            db.commit()
+    async def _execute_item_attempt(self, ctx: ItemContext, attempt_number: int) -> None:
+        run_id = ctx.run_id
+        run_item_id = ctx.run_item_id
+        request_template = ctx.request_template
+        semaphore = await self._get_semaphore(ctx.semaphore_key, ctx.max_in_flight)
 
-            request_template = build_request(connection, car, test_case)
-            expected_constraints = test_case.expected_constraints
-
-        semaphore = self._get_semaphore(semaphore_key, max_in_flight)
-
-        started_ms = int(time.perf_counter() * 1000)
+        started_ns = time.perf_counter_ns()
         ttft_ms: int | None = None
         streamed_parts: list[str] = []
+        token_batcher = TokenBatcher(
+            lambda text: self.telemetry.enqueue(
+                run_id,
+                "token.delta",
+                {"run_item_id": run_item_id, "token": text},
+                run_item_id=run_item_id,
+            )
+        )
         loop_messages = request_template.messages.copy()
+        # Only the message list changes between tool-loop steps, and it is appended to in place,
+        # so one request built from the template serves every step.
+        request = replace(request_template, stream=True, messages=loop_messages)
         last_response: dict[str, Any] | None = None
         tool_loop_exhausted = False
-
-        async with semaphore:
-            for loop_idx in range(self.settings.tool_loop_limit):
-                request = NormalizedChatRequest(
-                    model=request_template.model,
-                    messages=loop_messages,
-                    temperature=request_template.temperature,
-                    top_p=request_template.top_p,
-                    max_tokens=request_template.max_tokens,
-                    stop=request_template.stop,
-                    seed=request_template.seed,
-                    tools=request_template.tools,
-                    tool_choice=request_template.tool_choice,
-                    stream=True,
-                    metadata=request_template.metadata,
+        tool_call_rows: list[dict[str, Any]] = []
+
+        # Defined once per attempt; after the first token the per-token work is an append plus the batcher.
+        async def on_token(token: str) -> None:
+            nonlocal ttft_ms
+            streamed_parts.append(token)
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter_ns() - started_ns) // 1_000_000
+                self.telemetry.enqueue(
+                    run_id,
+                    "ttft.recorded",
+                    {"run_item_id": run_item_id, "ttft_ms": ttft_ms},
+                    run_item_id=run_item_id,
                 )
+            token_batcher.add(token)
 
-                with self.session_factory() as db:
-                    emit_event(
-                        db,
+        async def on_telemetry(event_type: str, payload: dict[str, Any]) -> None:
+            self.telemetry.enqueue(run_id, event_type, payload, run_item_id=run_item_id)
+
+        try:
+            async with semaphore:
+                for loop_idx in range(self.settings.tool_loop_limit):
+                    self.telemetry.enqueue(
                         run_id,
                         "request.sent",
                         {
@@ -302,92 +400,66 @@ class RaceExecutor:
                         run_item_id=run_item_id,
                     )
 
-                async def on_token(token: str) -> None:
-                    nonlocal ttft_ms
-                    streamed_parts.append(token)
-                    if ttft_ms is None:
-                        now_ms = int(time.perf_counter() * 1000)
-                        ttft_ms = max(0, now_ms - started_ms)
-                        with self.session_factory() as db:
-                            emit_event(
-                                db,
-                                run_id,
-                                "ttft.recorded",
-                                {"run_item_id": run_item_id, "ttft_ms": ttft_ms},
-                                run_item_id=run_item_id,
-                            )
-                    with self.session_factory() as db:
-                        emit_event(
-                            db,
-                            run_id,
-                            "token.delta",
-                            {"run_item_id": run_item_id, "token": token},
-                            run_item_id=run_item_id,
-                        )
-
-                async def on_telemetry(event_type: str, payload: dict[str, Any]) -> None:
-                    with self.session_factory() as db:
-                        emit_event(db, run_id, event_type, payload, run_item_id=run_item_id)
-
-                provider_response = await self.provider_client.generate(
-                    connection=connection_context,  # detached-safe lightweight context
-                    request=request,
-                    timeout_ms=timeout_ms,
-                    on_token=on_token,
-                    on_telemetry=on_telemetry,
-                )
-                last_response = {
-                    "text": provider_response.text,
-                    "tool_calls": provider_response.tool_calls,
-                    "usage": provider_response.usage,
-                    "raw": provider_response.raw,
-                }
-
-                tool_calls = provider_response.tool_calls
-                provider_style = "native"
-                if not tool_calls:
-                    fallback = parse_fallback_tool_command(provider_response.text)
-                    if fallback:
-                        tool_calls = [{"id": f"fallback_{loop_idx}", "name": fallback["name"], "arguments": fallback["arguments"]}]
-                        provider_style = "fallback"
-
-                if not tool_calls:
-                    break
-
-                if loop_idx == self.settings.tool_loop_limit - 1:
-                    tool_loop_exhausted = True
-                assistant_content = provider_response.text or ""
-                if assistant_content:
-                    loop_messages.append(NormalizedMessage(role="assistant", content=assistant_content))
-
-                for tool in tool_calls:
-                    tool_name = tool.get("name", "")
-                    args = tool.get("arguments", {})
-                    if not isinstance(args, dict):
-                        args = {"raw": args}
-
                     try:
-                        result = execute_tool(tool_name, args)
-                        status = "ok"
-                    except ToolExecutionError as exc:
-                        result = {"error": str(exc)}
-                        status = "error"
-
-                    with self.session_factory() as db:
-                        db.add(
-                            ToolCall(
-                                run_item_id=run_item_id,
-                                loop_index=loop_idx,
-                                tool_name=tool_name,
-                                args_json=args,
-                                result_json=result,
-                                status=status,
-                                provider_style=provider_style,
-                            )
+                        provider_response = await self.provider_client.generate(
+                            connection=ctx.connection_context,  # detached-safe lightweight context
+                            request=request,
+                            timeout_ms=ctx.timeout_ms,
+                            on_token=on_token,
+                            on_telemetry=on_telemetry,
                         )
-                        db.commit()
-                        emit_event(
-                            db,
+                    finally:
+                        # Also on failure, so the token.delta events of a failed attempt are complete.
+                        token_batcher.flush()
+                    last_response = {
+                        "text": provider_response.text,
+                        "tool_calls": provider_response.tool_calls,
+                        "usage": provider_response.usage,
+                        "raw": provider_response.raw,
+                    }
+
+                    tool_calls = provider_response.tool_calls
+                    provider_style = "native"
+                    if not tool_calls:
+                        fallback = parse_fallback_tool_command(provider_response.text)
+                        if fallback:
+                            tool_calls = [{"id": f"fallback_{loop_idx}", "name": fallback["name"], "arguments": fallback["arguments"]}]
+                            provider_style = "fallback"
+
+                    if not tool_calls:
+                        break
+
+                    if loop_idx == self.settings.tool_loop_limit - 1:
+                        tool_loop_exhausted = True
+                    assistant_content = provider_response.text or ""
+                    if assistant_content:
+                        loop_messages.append(NormalizedMessage(role="assistant", content=assistant_content))
+
+                    for tool in tool_calls:
+                        tool_name = tool.get("name", "")
+                        args = tool.get("arguments", {})
+                        if not isinstance(args, dict):
+                            args = {"raw": args}
+
+                        try:
+                            result = execute_tool(tool_name, args)
+                            status = "ok"
+                        except ToolExecutionError as exc:
+                            result = {"error": str(exc)}
+                            status = "error"
+
+                        tool_call_rows.append(
+                            {
+                                "run_item_id": run_item_id,
+                                "loop_index": loop_idx,
+                                "tool_name": tool_name,
+                                "args_json": args,
+                                "result_json": result,
+                                "status": status,
+                                "provider_style": provider_style,
+                            }
+                        )
+                        self.telemetry.enqueue(
                             run_id,
                             "tool.call.executed",
                             {
@@ -400,18 +472,16 @@ class RaceExecutor:
                             run_item_id=run_item_id,
                         )
 
-                    loop_messages.append(
-                        NormalizedMessage(
-                            role="tool",
-                            name=tool_name,
-                            tool_call_id=tool.get("id"),
-                            content=json.dumps(result),
+                        loop_messages.append(
+                            NormalizedMessage(
+                                role="tool",
+                                name=tool_name,
+                                tool_call_id=tool.get("id"),
+                                content=orjson.dumps(result).decode(),
+                            )
                         )
-                    )
 
-                with self.session_factory() as db:
-                    emit_event(
-                        db,
+                    self.telemetry.enqueue(
                         run_id,
                         "tool.loop.continue",
                         {
@@ -421,56 +491,72 @@ class RaceExecutor:
                         },
                         run_item_id=run_item_id,
                     )
+        except Exception:
+            # The final write-back below never runs for a failed attempt; keep the tool calls that
+            # already ran (their tool.call.executed events are in the stream) before retrying.
+            if tool_call_rows:
+                async with self.session_factory() as db:
+                    await db.execute(insert(ToolCall), tool_call_rows)
+                    await db.commit()
+            raise
 
         if tool_loop_exhausted:
-            with self.session_factory() as db:
-                emit_event(
-                    db,
-                    run_id,
-                    "tool.loop.exhausted",
-                    {
-                        "run_item_id": run_item_id,
-                        "limit": self.settings.tool_loop_limit,
-                    },
-                    run_item_id=run_item_id,
-                )
+            self.telemetry.enqueue(
+                run_id,
+                "tool.loop.exhausted",
+                {
+                    "run_item_id": run_item_id,
+                    "limit": self.settings.tool_loop_limit,
+                },
+                run_item_id=run_item_id,
+            )
 
-        finished_ms = int(time.perf_counter() * 1000)
-        output_text = "".join(streamed_parts) if streamed_parts else (last_response or {}).get("text", "")
+        finished_ns = time.perf_counter_ns()
+        streamed_text = "".join(streamed_parts)
+        output_text = streamed_text or (last_response or {}).get("text", "")
         usage = (last_response or {}).get("usage", {})
         completion_tokens = usage.get("completion_tokens")
         usage_estimated = bool(usage.get("estimated", False))
         metric_values = compute_metrics(
-            started_ms=started_ms,
-            finished_ms=finished_ms,
+            started_ms=started_ns // 1_000_000,
+            finished_ms=finished_ns // 1_000_000,
             ttft_ms=ttft_ms,
             output_text=output_text,
             usage_completion_tokens=completion_tokens,
             usage_estimated=usage_estimated,
         )
-        assertion_summary = evaluate_expected_constraints(expected_constraints, output_text)
-
-        with self.session_factory() as db:
-            run_item = db.get(RunItem, run_item_id)
+        assertion_summary = evaluate_expected_constraints(ctx.expected_constraints, output_text)
+        raw = (last_response or {}).get("raw", {}) or {}
+        if self.settings.persist_raw_provider_payload:
+            payload_raw = dict(raw)
+        else:
+            # Only the summary is read back (assertions live alongside it); the chunk list is debug data.
+            payload_raw = {"provider": raw.get("provider"), "usage": usage}
+        if assertion_summary["total"] > 0:
+            payload_raw["assertions"] = assertion_summary
+        request_messages = [
+            {
+                "role": m.role,
+                "content": m.content,
+                "tool_call_id": m.tool_call_id,
+                "name": m.name,
+            }
+            for m in loop_messages
+        ]
+
+        async with self.session_factory() as db:
+            run_item = await db.get(RunItem, run_item_id)
             if not run_item:
                 return
 
-            existing_output = db.scalar(select(Output).where(Output.run_item_id == run_item_id))
-            payload_raw = dict((last_response or {}).get("raw", {}) or {})
-            if assertion_summary["total"] > 0:
-                payload_raw["assertions"] = assertion_summary
-            request_messages = [
-                {
-                    "role": m.role,
-                    "content": m.content,
-                    "tool_call_id": m.tool_call_id,
-                    "name": m.name,
-                }
-                for m in loop_messages
-            ]
+            # Tool calls are persisted with the attempt's outputs in one transaction instead of a commit each.
+            if tool_call_rows:
+                await db.execute(insert(ToolCall), tool_call_rows)
+
+            existing_output = await db.scalar(select(Output).where(Output.run_item_id == run_item_id))
             if existing_output:
                 existing_output.request_messages_json = request_messages
-                existing_output.streamed_text = "".join(streamed_parts)
+                existing_output.streamed_text = streamed_text
                 existing_output.final_text = output_text
                 existing_output.raw_provider_payload_json = payload_raw
             else:
@@ -478,13 +564,13 @@ class RaceExecutor:
                     Output(
                         run_item_id=run_item_id,
                         request_messages_json=request_messages,
-                        streamed_text="".join(streamed_parts),
+                        streamed_text=streamed_text,
                         final_text=output_text,
                         raw_provider_payload_json=payload_raw,
                     )
                 )
 
-            existing_metric = db.scalar(select(Metric).where(Metric.run_item_id == run_item_id))
+            existing_metric = await db.scalar(select(Metric).where(Metric.run_item_id == run_item_id))
             if existing_metric:
                 existing_metric.ttft_ms = metric_values.ttft_ms
                 existing_metric.total_latency_ms = metric_values.total_latency_ms
@@ -507,13 +593,13 @@ class RaceExecutor:
                     )
                 )
 
+            run_item.attempt_count = attempt_number
             run_item.status = RunItemStatus.PARTIAL_TOOL_SUPPORT if tool_loop_exhausted else RunItemStatus.COMPLETED
             run_item.finished_at = datetime.utcnow()
             run_item.error_message = None
-            db.commit()
+            await db.commit()
 
-            emit_event(
-                db,
+            self.telemetry.enqueue(
                 run_id,
                 "item.metrics",
                 {
@@ -527,8 +613,7 @@ class RaceExecutor:
                 run_item_id=run_item_id,
             )
             if assertion_summary["total"] > 0:
-                emit_event(
-                    db,
+                self.telemetry.enqueue(
                     run_id,
                     "item.assertions",
                     {
@@ -538,18 +623,18 @@ class RaceExecutor:
                     },
                     run_item_id=run_item_id,
                 )
-            emit_event(
-                db,
+            self.telemetry.enqueue(
                 run_id,
                 "item.completed",
                 {"run_item_id": run_item_id, "status": run_item.status.value},
                 run_item_id=run_item_id,
             )
 
-    def _get_semaphore(self, key: str, max_in_flight: int) -> asyncio.Semaphore:
-        max_size = max(1, max_in_flight)
-        existing = self._semaphores.get(key)
-        if existing is None:
-            existing = asyncio.Semaphore(max_size)
-            self._semaphores[key] = existing
-        return existing
+    async def _get_semaphore(self, key: str, max_in_flight: int) -> asyncio.Semaphore:
+        # Serialized so concurrent items for one provider can never end up with separate semaphores.
+        async with self._semaphore_lock:
+            existing = self._semaphores.get(key)
+            if existing is None:
+                existing = asyncio.Semaphore(max(1, max_in_flight))
+                self._semaphores[key] = existing
+            return existing
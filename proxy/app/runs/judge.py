@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import json
 import re
 from typing import Any
 
+import orjson
 from pydantic import BaseModel, Field, ValidationError
 
 
@@ -15,6 +15,9 @@ class JudgePayload(BaseModel):
     rationale: str
 
 
+_JUDGE_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
 def build_judge_messages(test_name: str, prompt: str, output_text: str) -> list[dict[str, str]]:
     rubric = (
         "You are an LLM judge. Score output quality in strict JSON only. "
@@ -35,13 +38,13 @@ def build_judge_messages(test_name: str, prompt: str, output_text: str) -> list[
 def parse_judge_json(raw_text: str) -> dict[str, Any]:
     stripped = raw_text.strip()
     if stripped.startswith("{") and stripped.endswith("}"):
-        payload = json.loads(stripped)
+        payload = orjson.loads(stripped)
         return JudgePayload.model_validate(payload).model_dump()
 
     # Recover from wrappers like markdown fences.
-    match = re.search(r"\{.*\}", raw_text, flags=re.DOTALL)
+    match = _JUDGE_JSON_RE.search(raw_text)
     if not match:
         raise ValidationError.from_exception_data("JudgePayload", [])
 
-    payload = json.loads(match.group(0))
+    payload = orjson.loads(match.group(0))
     return JudgePayload.model_validate(payload).model_dump()
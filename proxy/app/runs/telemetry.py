@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
 from app.db.models import TelemetryEvent
 
+logger = logging.getLogger(__name__)
+
 
 def emit_event(
     db: Session,
@@ -15,24 +21,174 @@ def emit_event(
     event_type: str,
     payload: dict[str, Any],
     run_item_id: int | None = None,
-) -> TelemetryEvent:
-    max_seq = db.scalar(select(func.max(TelemetryEvent.seq_no)).where(TelemetryEvent.run_id == run_id)) or 0
-    event = TelemetryEvent(
-        run_id=run_id,
-        run_item_id_nullable=run_item_id,
-        seq_no=max_seq + 1,
-        event_type=event_type,
-        payload_json={
-            **payload,
-            "timestamp": datetime.utcnow().isoformat(),
-            "run_id": run_id,
-            "run_item_id": run_item_id,
-        },
+) -> int:
+    # Core insert: no identity-map bookkeeping and no refresh SELECT; callers only need the seq_no.
+    seq_no = (db.scalar(select(func.max(TelemetryEvent.seq_no)).where(TelemetryEvent.run_id == run_id)) or 0) + 1
+    db.execute(
+        insert(TelemetryEvent).values(
+            run_id=run_id,
+            run_item_id_nullable=run_item_id,
+            seq_no=seq_no,
+            event_type=event_type,
+            payload_json={
+                **payload,
+                "timestamp": datetime.utcnow().isoformat(),
+                "run_id": run_id,
+                "run_item_id": run_item_id,
+            },
+        )
     )
-    db.add(event)
     db.commit()
-    db.refresh(event)
-    return event
+    return seq_no
+
+
+class TelemetryBuffer:
+    # Collects executor events in memory and writes them in batches from a single writer,
+    # assigning per-run seq_no values in enqueue order. The counter for a run is seeded
+    # once from MAX(seq_no), so the per-event MAX query and per-event commit go away.
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch: int = 500,
+        flush_interval_s: float = 0.05,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval_s = flush_interval_s
+        self._pending: list[tuple[int, int | None, str, dict[str, Any], float]] = []
+        self._seq_counters: dict[int, int] = {}
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._writer_task: asyncio.Task[None] | None = None
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._writer_task is None:
+            self._stopping = False
+            self._writer_task = asyncio.create_task(self._writer_loop())
+
+    async def stop(self) -> None:
+        # Let the writer finish its current batch and exit on its own; cancelling it mid-write
+        # would abandon that batch.
+        if self._writer_task:
+            self._stopping = True
+            self._wakeup.set()
+            await self._writer_task
+            self._writer_task = None
+        await self.flush()
+
+    async def open_run(self, db: AsyncSession, run_id: int) -> None:
+        # Seed the run's counter with one MAX(seq_no) when the executor picks the run up; it is the
+        # only writer while the run is active, so every later event is numbered in memory.
+        if run_id not in self._seq_counters:
+            self._seq_counters[run_id] = (
+                await db.scalar(select(func.max(TelemetryEvent.seq_no)).where(TelemetryEvent.run_id == run_id)) or 0
+            )
+
+    def release_run(self, run_id: int) -> None:
+        # Once the run's final events are written, other writers (the judge) may append to it,
+        # so the next executor event for this run must re-read MAX(seq_no).
+        self._seq_counters.pop(run_id, None)
+
+    def enqueue(
+        self,
+        run_id: int,
+        event_type: str,
+        payload: dict[str, Any],
+        run_item_id: int | None = None,
+    ) -> None:
+        # The buffer takes ownership of `payload`: the timestamp and ids are added to it in place at
+        # flush time, so callers must pass a dict they no longer touch (the executor builds a fresh
+        # literal per event). Only the wall-clock time is captured here; formatting waits for the flush.
+        self._pending.append((run_id, run_item_id, event_type, payload, time.time()))
+        self._wakeup.set()
+
+    async def flush(self, db: AsyncSession | None = None) -> None:
+        # With a caller-owned session the events join its transaction and the caller commits;
+        # this lets a status change and its event become visible together.
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            written = 0
+            try:
+                if db is not None:
+                    self._apply_seq(await self._write(db, batch))
+                    written = len(batch)
+                    return
+                async with self.session_factory() as own_db:
+                    for start in range(0, len(batch), self.max_batch):
+                        chunk = batch[start : start + self.max_batch]
+                        batch_seq = await self._write(own_db, chunk)
+                        await own_db.commit()
+                        self._apply_seq(batch_seq)
+                        written = start + len(chunk)
+            except BaseException:
+                # Put back everything not yet committed, ahead of events enqueued meanwhile so the
+                # order (and the seq_no values assigned on retry) stays the same. Counters only
+                # advance after a successful write, so nothing needs rolling back there.
+                self._pending[:0] = batch[written:]
+                raise
+
+    async def _writer_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Give a burst of events a moment to accumulate before paying for the commit.
+            if not self._stopping and len(self._pending) < self.max_batch:
+                await asyncio.sleep(self.flush_interval_s)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:  # noqa: BLE001
+                logger.exception("Telemetry batch write failed; retrying")
+                if self._stopping:
+                    return
+                # The batch is back in _pending; back off before retrying so a full batch
+                # that keeps failing (e.g. "database is locked") does not spin.
+                await asyncio.sleep(self.flush_interval_s)
+                self._wakeup.set()
+                continue
+            if self._stopping:
+                return
+
+    def _apply_seq(self, batch_seq: dict[int, int]) -> None:
+        # Only open runs keep a counter; see _write.
+        for run_id, seq_no in batch_seq.items():
+            if run_id in self._seq_counters:
+                self._seq_counters[run_id] = seq_no
+
+    async def _write(
+        self, db: AsyncSession, batch: list[tuple[int, int | None, str, dict[str, Any], float]]
+    ) -> dict[int, int]:
+        rows: list[dict[str, Any]] = []
+        # Numbering for this batch. Runs that are not open (never opened, or already released) are
+        # seeded from MAX(seq_no) here but never stored, so a released run's counter is not resurrected.
+        batch_seq: dict[int, int] = {}
+        for run_id, run_item_id, event_type, payload, enqueued_at in batch:
+            seq_no = batch_seq.get(run_id)
+            if seq_no is None:
+                seq_no = self._seq_counters.get(run_id)
+            if seq_no is None:
+                seq_no = await db.scalar(select(func.max(TelemetryEvent.seq_no)).where(TelemetryEvent.run_id == run_id)) or 0
+            seq_no += 1
+            batch_seq[run_id] = seq_no
+            created_at = datetime.fromtimestamp(enqueued_at, UTC).replace(tzinfo=None)
+            payload["timestamp"] = created_at.isoformat()
+            payload["run_id"] = run_id
+            payload["run_item_id"] = run_item_id
+            rows.append(
+                {
+                    "run_id": run_id,
+                    "run_item_id_nullable": run_item_id,
+                    "seq_no": seq_no,
+                    "event_type": event_type,
+                    "payload_json": payload,
+                    "created_at": created_at,
+                }
+            )
+        # One executemany through Core instead of building mapped objects for every event.
+        await db.execute(insert(TelemetryEvent), rows)
+        return batch_seq
 
 
 def list_events_after(db: Session, run_id: int, after_seq: int) -> list[TelemetryEvent]:
@@ -1,99 +1,213 @@
 from __future__ import annotations
 
-import ast
-import json
+import math
 import operator
 import re
-from typing import Any
-
-_ALLOWED_BIN_OPS: dict[type, Any] = {
-    ast.Add: operator.add,
-    ast.Sub: operator.sub,
-    ast.Mult: operator.mul,
-    ast.Div: operator.truediv,
-    ast.Pow: operator.pow,
-    ast.Mod: operator.mod,
-}
-_ALLOWED_UNARY_OPS: dict[type, Any] = {
-    ast.UAdd: operator.pos,
-    ast.USub: operator.neg,
+from functools import lru_cache
+from typing import Any, Callable
+
+import orjson
+
+from app.core.settings import get_settings
+
+# Binary operators with Python's precedence; unary +/- sit between */% and ** so that
+# -2**2 == -4 and 2**-1 == 0.5, exactly as the old AST-based evaluator behaved.
+_BINARY_OPS: dict[str, tuple[int, Callable[[float, float], float]]] = {
+    "+": (1, operator.add),
+    "-": (1, operator.sub),
+    "*": (2, operator.mul),
+    "/": (2, operator.truediv),
+    "%": (2, operator.mod),
+    "**": (4, operator.pow),
 }
+_UNARY_OPS: dict[str, Callable[[float], float]] = {"u+": operator.pos, "u-": operator.neg}
+_UNARY_PRECEDENCE = 3
+# ASCII only: \d would otherwise accept any Unicode digit, which the old AST evaluator rejected.
+_CALC_TOKEN_RE = re.compile(r"\s*(?:((?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)|(\*\*|[-+*/%()]))", re.ASCII)
+# Read once at import; oversized inputs are rejected before any scan or decode.
+_MAX_JSON_LEN = get_settings().tool_json_max_chars
+_CODE_BLOCK_RE = re.compile(r"```(?:[a-zA-Z0-9_+-]+)?\n(.*?)```", re.DOTALL)
 
 
 class ToolExecutionError(Exception):
     pass
 
 
-def _safe_eval(node: ast.AST) -> float:
-    if isinstance(node, ast.Expression):
-        return _safe_eval(node.body)
-    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
-        return float(node.value)
-    if isinstance(node, ast.BinOp) and type(node.op) in _ALLOWED_BIN_OPS:
-        left = _safe_eval(node.left)
-        right = _safe_eval(node.right)
-        return float(_ALLOWED_BIN_OPS[type(node.op)](left, right))
-    if isinstance(node, ast.UnaryOp) and type(node.op) in _ALLOWED_UNARY_OPS:
-        return float(_ALLOWED_UNARY_OPS[type(node.op)](_safe_eval(node.operand)))
-    raise ToolExecutionError("Unsupported expression")
+def _to_rpn(expression: str) -> list[float | str]:
+    # Shunting-yard over number, operator and parenthesis tokens. Anything else (names, calls,
+    # attribute access) fails to tokenize, so no allow-list walk is needed afterwards.
+    output: list[float | str] = []
+    operators: list[str] = []
+    expect_operand = True
+    text = expression.strip()
+    pos = 0
+    while pos < len(text):
+        match = _CALC_TOKEN_RE.match(text, pos)
+        if match is None:
+            raise ToolExecutionError("Unsupported expression")
+        pos = match.end()
+        number, token = match.groups()
+        if number is not None:
+            if not expect_operand:
+                raise ToolExecutionError("Unsupported expression")
+            # Float arithmetic throughout, as before; this also keeps 9**9**9 from becoming a giant int.
+            value = float(number)
+            if not math.isfinite(value):
+                raise ToolExecutionError("Number out of range")
+            output.append(value)
+            expect_operand = False
+        elif token == "(":
+            if not expect_operand:
+                raise ToolExecutionError("Unsupported expression")
+            operators.append(token)
+        elif token == ")":
+            if expect_operand:
+                raise ToolExecutionError("Unsupported expression")
+            while operators and operators[-1] != "(":
+                output.append(operators.pop())
+            if not operators:
+                raise ToolExecutionError("Unbalanced parentheses")
+            operators.pop()
+        elif expect_operand:
+            if token not in ("+", "-"):
+                raise ToolExecutionError("Unsupported expression")
+            # Prefix operators never pop: they apply to whatever operand follows.
+            operators.append("u" + token)
+        else:
+            precedence = _BINARY_OPS[token][0]
+            right_associative = token == "**"
+            while operators and operators[-1] != "(":
+                top = operators[-1]
+                top_precedence = _UNARY_PRECEDENCE if top in _UNARY_OPS else _BINARY_OPS[top][0]
+                if top_precedence > precedence or (top_precedence == precedence and not right_associative):
+                    output.append(operators.pop())
+                else:
+                    break
+            operators.append(token)
+            expect_operand = True
+    if expect_operand:
+        raise ToolExecutionError("Unsupported expression")
+    while operators:
+        top = operators.pop()
+        if top == "(":
+            raise ToolExecutionError("Unbalanced parentheses")
+        output.append(top)
+    return output
+
+
+@lru_cache(maxsize=2048)
+def _evaluate(expression: str) -> float:
+    # Expressions have no free variables, so the value itself is cached; repeat calls
+    # (one per car on the same test) become a single dict lookup.
+    stack: list[float] = []
+    for item in _to_rpn(expression):
+        if isinstance(item, float):
+            stack.append(item)
+        elif item in _UNARY_OPS:
+            stack[-1] = _UNARY_OPS[item](stack[-1])
+        else:
+            right = stack.pop()
+            stack[-1] = _BINARY_OPS[item][1](stack[-1], right)
+    result = float(stack[0])
+    if not math.isfinite(result):
+        raise ToolExecutionError("Result out of range")
+    return result
 
 
 def calculator(expression: str) -> float:
     try:
-        tree = ast.parse(expression, mode="eval")
-        return _safe_eval(tree)
+        return _evaluate(expression)
     except Exception as exc:  # noqa: BLE001
         raise ToolExecutionError(f"calculator failed: {exc}") from exc
 
 
 def json_validate(json_string: str) -> dict[str, Any]:
+    if len(json_string) > _MAX_JSON_LEN:
+        return {"valid": False, "error": f"too large: {len(json_string)} characters exceeds the {_MAX_JSON_LEN} limit"}
     try:
-        json.loads(json_string)
+        orjson.loads(json_string)
         return {"valid": True}
-    except json.JSONDecodeError as exc:
+    except orjson.JSONDecodeError as exc:
         return {"valid": False, "error": str(exc)}
 
 
 def extract_code_blocks(text: str) -> list[str]:
-    pattern = re.compile(r"```(?:[a-zA-Z0-9_+-]+)?\n(.*?)```", re.DOTALL)
-    return [m.strip() for m in pattern.findall(text)]
+    return [m.strip() for m in _CODE_BLOCK_RE.findall(text)]
+
+
+def _run_calculator(args: dict[str, Any]) -> dict[str, Any]:
+    return {"result": calculator(str(args.get("expression", "")))}
+
+
+def _run_json_validate(args: dict[str, Any]) -> dict[str, Any]:
+    return json_validate(str(args.get("json_string", "")))
+
+
+def _run_extract_code_blocks(args: dict[str, Any]) -> dict[str, Any]:
+    return {"blocks": extract_code_blocks(str(args.get("text", "")))}
+
+
+_TOOLS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "calculator": _run_calculator,
+    "json_validate": _run_json_validate,
+    "extract_code_blocks": _run_extract_code_blocks,
+}
 
 
 def execute_tool(tool_name: str, args: dict[str, Any]) -> dict[str, Any]:
-    if tool_name == "calculator":
-        expression = str(args.get("expression", ""))
-        return {"result": calculator(expression)}
-    if tool_name == "json_validate":
-        return json_validate(str(args.get("json_string", "")))
-    if tool_name == "extract_code_blocks":
-        return {"blocks": extract_code_blocks(str(args.get("text", "")))}
-    raise ToolExecutionError(f"Unknown tool: {tool_name}")
+    tool = _TOOLS.get(tool_name)
+    if tool is None:
+        raise ToolExecutionError(f"Unknown tool: {tool_name}")
+    return tool(args)
+
+
+def _first_json_object(text: str) -> str | None:
+    # Single pass from the first "{" to the brace that balances it, ignoring braces inside strings.
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : index + 1]
+    return None
 
 
 def parse_fallback_tool_command(text: str) -> dict[str, Any] | None:
     # Fallback for models that output a JSON command instead of native tool_calls.
-    payload: dict[str, Any] | None = None
+    # Exactly one candidate is decoded: the whole reply when it is an object, else the first embedded one.
+    if len(text) > _MAX_JSON_LEN or '"tool"' not in text:
+        # Plain prose is the common case; a command must contain the "tool" key, so skip the scan and decode.
+        # Oversized replies are not treated as commands at all.
+        return None
     stripped = text.strip()
     if stripped.startswith("{") and stripped.endswith("}"):
-        try:
-            parsed = json.loads(stripped)
-            if isinstance(parsed, dict):
-                payload = parsed
-        except json.JSONDecodeError:
-            payload = None
-
-    if payload is None:
-        match = re.search(r"\{[\s\S]*\}", text)
-        if not match:
-            return None
-        try:
-            parsed = json.loads(match.group(0))
-            if isinstance(parsed, dict):
-                payload = parsed
-        except json.JSONDecodeError:
-            return None
-
-    if payload is None:
+        candidate: str | None = stripped
+    else:
+        candidate = _first_json_object(text)
+    if candidate is None:
+        return None
+    try:
+        payload = orjson.loads(candidate)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(payload, dict):
         return None
 
     tool = payload.get("tool")
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from app.db.models import ConnectionType, RunItemStatus, RunStatus
 
@@ -39,8 +39,7 @@ class ConnectionOut(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 class ConnectionTestResponse(BaseModel):
@@ -97,8 +96,7 @@ class CarOut(BaseModel):
     seed: int | None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 class TestCaseIn(BaseModel):
@@ -114,8 +112,7 @@ class TestCaseOut(TestCaseIn):
     id: int
     suite_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 class SuiteCreate(BaseModel):
@@ -142,8 +139,7 @@ class SuiteOut(BaseModel):
     updated_at: datetime
     tests: list[TestCaseOut]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 class StartRunRequest(BaseModel):
@@ -166,8 +162,7 @@ class RunItemOut(BaseModel):
     finished_at: datetime | None
     error_message: str | None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 class RunOut(BaseModel):
@@ -180,8 +175,7 @@ class RunOut(BaseModel):
     judge_car_id_nullable: int | None
     items: list[RunItemOut] = Field(default_factory=list)
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 class ProviderSettingOut(BaseModel):
@@ -191,8 +185,7 @@ class ProviderSettingOut(BaseModel):
     retry_count: int
     retry_backoff_ms: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 class ProviderSettingsUpdateItem(BaseModel):
@@ -243,10 +236,14 @@ class LeaderboardRow(BaseModel):
     avg_assertion_pass_rate: float | None
     avg_judge_overall: float | None
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 class LeaderboardResponse(BaseModel):
     rows: list[LeaderboardRow]
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 class RunScorecardRow(BaseModel):
     car_id: int
@@ -263,11 +260,15 @@ class RunScorecardRow(BaseModel):
     assertion_pass_rate: float | None
     avg_judge_overall: float | None
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 class RunScorecardResponse(BaseModel):
     run_id: int
     rows: list[RunScorecardRow]
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 class RunComparisonRow(BaseModel):
     car_id: int
@@ -280,8 +281,16 @@ class RunComparisonRow(BaseModel):
     judge_overall_delta: float | None
     summary: str
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 class RunComparisonResponse(BaseModel):
     run_id: int
     baseline_run_id: int
     rows: list[RunComparisonRow]
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+
+# Built once at import so the leaderboard route does not resolve a schema per request.
+LEADERBOARD_ROWS_ADAPTER: TypeAdapter[list[LeaderboardRow]] = TypeAdapter(list[LeaderboardRow])
@@ -8,15 +8,28 @@ from fastapi.testclient import TestClient
 os.environ['DATABASE_URL'] = 'sqlite:////app/test_llmrace.db'
 
 
-@pytest.fixture()
-def client() -> TestClient:
+@pytest.fixture(scope='session')
+def _schema() -> None:
+    # Build the schema once per session. The executor writes through its own async engine on separate
+    # connections, so a per-test rolled-back transaction (or a private in-memory database) would hide its
+    # rows from the API; tests share this file database and are isolated by clearing rows instead.
     from app.db.base import Base
     from app.db.session import engine
-    from app.main import create_app
 
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
 
+
+@pytest.fixture()
+def client(_schema: None) -> TestClient:
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import create_app
+
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
     app = create_app()
     with TestClient(app) as test_client:
         yield test_client
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import time
+import threading
 from typing import Any
 
 from app.providers.adapters import ProviderClient
 from app.providers.types import ProviderResponse
 
+_JUDGE_TEXT = '{"writing_score":8,"coding_score":7,"tool_score":9,"overall":8,"rationale":"Consistent output."}'
+# The judge route only reads the response, so one shared instance serves every judge call.
+_JUDGE_RESPONSE = ProviderResponse(text=_JUDGE_TEXT, tool_calls=[], usage={'completion_tokens': 24}, raw={'mock': True})
+
 
 async def fake_discover_models(self: ProviderClient, connection: Any, timeout_ms: int = 8000) -> list[str]:
     return ['demo-model', 'judge-model']
@@ -20,9 +24,8 @@ async def fake_generate(
     on_telemetry: Any = None,
 ) -> ProviderResponse:
     if request.metadata.get('judge'):
-        text = '{"writing_score":8,"coding_score":7,"tool_score":9,"overall":8,"rationale":"Consistent output."}'
-        await on_token(text)
-        return ProviderResponse(text=text, tool_calls=[], usage={'completion_tokens': 24}, raw={'mock': True})
+        await on_token(_JUDGE_TEXT)
+        return _JUDGE_RESPONSE
 
     text = f"model={request.model} prompt_ok"
     await on_token(text)
@@ -32,14 +35,28 @@ async def fake_generate(
 
 
 def _wait_for_run_completion(client: Any, run_id: int, timeout_seconds: int = 8) -> dict[str, Any]:
-    deadline = time.time() + timeout_seconds
-    while time.time() < deadline:
-        response = client.get(f'/api/runs/{run_id}')
-        payload = response.json()
-        if payload['run']['status'] in ('COMPLETED', 'FAILED'):
-            return payload
-        time.sleep(0.2)
-    raise AssertionError('Run did not complete in time')
+    # Follow the run's SSE stream instead of polling; run.completed is committed together with the
+    # final run status, so a single GET afterwards sees the finished run. The stream is read on a
+    # daemon thread so the deadline holds even when no line (not even a heartbeat) arrives.
+    completed = threading.Event()
+
+    def follow_stream() -> None:
+        with client.stream('GET', f'/api/runs/{run_id}/stream?after_seq=0') as stream:
+            for line in stream.iter_lines():
+                if line == 'event: run.completed':
+                    completed.set()
+                    return
+
+    reader = threading.Thread(target=follow_stream, daemon=True)
+    reader.start()
+    reader.join(timeout_seconds)
+    if not completed.is_set():
+        if reader.is_alive():
+            raise AssertionError('Run did not complete in time')
+        raise AssertionError('Run stream ended before run.completed')
+    payload = client.get(f'/api/runs/{run_id}').json()
+    assert payload['run']['status'] in ('COMPLETED', 'FAILED')
+    return payload
 
 
 def test_connection_suite_seed_and_models(client: Any, monkeypatch: Any) -> None:
@@ -1,5 +1,5 @@
 from app.runs.judge import parse_judge_json
-from app.runs.metrics import compute_metrics
+from app.runs.metrics import compute_metrics, estimate_tokens
 
 
 def test_compute_metrics_estimated_tokens() -> None:
@@ -19,6 +19,11 @@ def test_compute_metrics_estimated_tokens() -> None:
     assert round(metrics.tokens_per_sec, 4) == round(metrics.output_tokens / 1.1, 4)
 
 
+def test_estimate_tokens_matches_whitespace_split() -> None:
+    for text in ['', '   ', 'one', 'hello  world\n\tfrom\u00a0llm ', 'a b c d e f g h']:
+        assert estimate_tokens(text) == max(1, int(len(text.split()) * 1.25))
+
+
 def test_parse_judge_json() -> None:
     payload = parse_judge_json('{"writing_score":8,"coding_score":7,"tool_score":9,"overall":8,"rationale":"Solid"}')
     assert payload['overall'] == 8
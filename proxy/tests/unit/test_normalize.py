@@ -1,5 +1,5 @@
-from app.db.models import ConnectionType
-from app.providers.normalize import provider_mode
+from app.db.models import Car, Connection, ConnectionType, TestCase
+from app.providers.normalize import build_connection_context, build_request, provider_mode
 
 
 def test_provider_mode_mapping() -> None:
@@ -10,3 +10,29 @@ def test_provider_mode_mapping() -> None:
     assert provider_mode(ConnectionType.OPENAI_COMPAT) == 'openai_compat'
     assert provider_mode(ConnectionType.LLAMACPP_OPENAI) == 'openai_compat'
     assert provider_mode(ConnectionType.CUSTOM) == 'openai_compat'
+
+
+def test_build_connection_context_copies_connection_fields() -> None:
+    connection = Connection(
+        id=7,
+        name='local',
+        type=ConnectionType.OPENAI_COMPAT,
+        base_url='http://localhost:8080/v1',
+        api_key_env_var='LOCAL_KEY',
+    )
+    context = build_connection_context(connection)
+    assert context.id == 7
+    assert context.type == ConnectionType.OPENAI_COMPAT
+    assert context.base_url == 'http://localhost:8080/v1'
+    assert context.api_key_env_var == 'LOCAL_KEY'
+    assert context.api_key_encrypted is None
+    assert not hasattr(context, '__dict__')
+
+
+def test_build_request_opts_into_response_cache_only_when_enabled() -> None:
+    connection = Connection(id=7, name='local', type=ConnectionType.OPENAI_COMPAT, base_url='http://localhost:8080/v1')
+    car = Car(id=3, model_name='demo-model', temperature=0, seed=1)
+    test_case = TestCase(id=5, user_prompt='hi')
+    assert 'cache' not in build_request(connection, car, test_case).metadata
+    request = build_request(connection, car, test_case, cache_ttl_seconds=30)
+    assert request.metadata['cache'] == {'type': 'exact_match', 'ttl': 30}
@@ -53,3 +53,15 @@ def test_openrouter_optional_headers() -> None:
     assert headers["Authorization"] == "Bearer openrouter-key"
     assert headers["HTTP-Referer"] == "https://example.app"
     assert headers["X-Title"] == "LLMRace Tests"
+
+
+def test_endpoint_cache_rebuilds_when_key_changes() -> None:
+    client = ProviderClient()
+    connection = _conn(ConnectionType.OPENAI, api_key_encrypted=encrypt_secret("first"))
+    connection.base_url = "https://example.com/"
+    base_url, headers = client._endpoint_for(connection)  # noqa: SLF001
+    assert base_url == "https://example.com"
+    assert client._endpoint_for(connection)[1] is headers  # noqa: SLF001
+
+    connection.api_key_encrypted = encrypt_secret("second")
+    assert client._endpoint_for(connection)[1]["Authorization"] == "Bearer second"  # noqa: SLF001
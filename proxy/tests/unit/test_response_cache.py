@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+from app.db.models import ConnectionType
+from app.providers.adapters import ProviderClient
+from app.providers.cache import ResponseCache, cache_key, cache_ttl
+from app.providers.types import NormalizedChatRequest, NormalizedMessage, ProviderResponse
+
+
+def _request(content: str, metadata: dict | None = None) -> NormalizedChatRequest:
+    return NormalizedChatRequest(
+        model='demo-model',
+        messages=[NormalizedMessage(role='user', content=content)],
+        temperature=0,
+        seed=7,
+        metadata=metadata or {},
+    )
+
+
+def _conn() -> SimpleNamespace:
+    return SimpleNamespace(id=1, type=ConnectionType.OPENAI, base_url='https://example.com')
+
+
+def test_cache_ttl_requires_exact_match_opt_in() -> None:
+    assert cache_ttl(_request('hi')) is None
+    assert cache_ttl(_request('hi', {'cache': {'type': 'semantic'}})) is None
+    assert cache_ttl(_request('hi', {'cache': {'type': 'exact_match', 'ttl': 60}})) == 60
+
+
+def test_cache_key_ignores_metadata_but_not_messages() -> None:
+    base = cache_key(_conn(), _request('hi'))
+    assert base == cache_key(_conn(), _request('hi', {'run_id': 3}))
+    assert base != cache_key(_conn(), _request('hello'))
+
+
+def test_response_cache_expires_and_evicts() -> None:
+    cache = ResponseCache(max_entries=1)
+    response = ProviderResponse(text='ok', tool_calls=[], usage={}, raw={})
+    cache.set('a', response, ttl_seconds=60)
+    assert cache.get('a') is response
+    cache.set('b', response, ttl_seconds=60)
+    assert cache.get('a') is None
+    cache.set('c', response, ttl_seconds=0)
+    assert cache.get('c') is None
+
+
+async def test_cache_hit_replays_tool_call_event_and_returns_a_copy() -> None:
+    client = ProviderClient()
+    live_calls = 0
+
+    async def fake_generate(connection, request, timeout_ms, on_token, on_telemetry):
+        nonlocal live_calls
+        live_calls += 1
+        tool_calls = [{'id': 'call_1', 'name': 'calculator', 'arguments': {'expression': '1+1'}}]
+        await on_token('ok')
+        await on_telemetry('tool.call.detected', {'count': 1, 'tool_calls': tool_calls})
+        return ProviderResponse(text='ok', tool_calls=tool_calls, usage={'total_tokens': 3}, raw={})
+
+    client._generate_openai_compat = fake_generate  # noqa: SLF001
+
+    async def run() -> tuple[list[str], list[tuple[str, dict]], ProviderResponse]:
+        tokens: list[str] = []
+        events: list[tuple[str, dict]] = []
+
+        async def on_token(text: str) -> None:
+            tokens.append(text)
+
+        async def on_telemetry(event_type: str, payload: dict) -> None:
+            events.append((event_type, payload))
+
+        request = _request('hi', {'cache': {'type': 'exact_match', 'ttl': 60}})
+        response = await client.generate(_conn(), request, 1000, on_token, on_telemetry)
+        return tokens, events, response
+
+    live = await run()
+    live[2].tool_calls[0]['arguments']['expression'] = 'mutated'
+    cached = await run()
+
+    assert live_calls == 1
+    assert cached[0] == ['ok']
+    assert cached[1] == [('tool.call.detected', {'count': 1, 'tool_calls': [{'id': 'call_1', 'name': 'calculator', 'arguments': {'expression': '1+1'}}]})]
+    cached[2].tool_calls.clear()
+    cached[2].usage.clear()
+    again = await run()
+    assert again[2].tool_calls[0]['arguments'] == {'expression': '1+1'}
+    assert again[2].usage == {'total_tokens': 3}
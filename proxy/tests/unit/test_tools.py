@@ -1,4 +1,7 @@
-from app.runs.tools import calculator, execute_tool, extract_code_blocks, json_validate, parse_fallback_tool_command
+import pytest
+
+from app.runs import tools
+from app.runs.tools import ToolExecutionError, calculator, execute_tool, extract_code_blocks, json_validate, parse_fallback_tool_command
 
 
 def test_calculator_and_execute_tool() -> None:
@@ -7,11 +10,29 @@ def test_calculator_and_execute_tool() -> None:
     assert out['result'] == 5
 
 
+def test_calculator_rejects_non_arithmetic() -> None:
+    assert calculator('-2**2') == -4
+    assert calculator('2**-1') == 0.5
+    assert calculator('2**3**2') == 512
+    assert calculator('(1 + 2) * -3 % 4') == (1 + 2) * -3 % 4
+    for expression in ['__import__("os")', 'abs(-1)', '9**9**9', '1/0', '(1+2', '1+2)', '2 3', '*2', '', '\u0663+1', '1\u00a0+1']:
+        with pytest.raises(ToolExecutionError):
+            calculator(expression)
+
+
+def test_calculator_rejects_non_finite_numbers() -> None:
+    for expression in ['9' * 400, '1e400', '1e308*10', '-1e308-1e308']:
+        with pytest.raises(ToolExecutionError):
+            calculator(expression)
+
+
 def test_json_validate() -> None:
     assert json_validate('{"a":1}') == {'valid': True}
     invalid = json_validate('{"a":1,}')
     assert invalid['valid'] is False
     assert 'error' in invalid
+    # orjson errors keep the stdlib "<msg>: line L column C (char N)" shape that models are shown.
+    assert 'line 1 column' in invalid['error']
 
 
 def test_extract_code_blocks() -> None:
@@ -22,3 +43,17 @@ def test_extract_code_blocks() -> None:
 def test_parse_fallback_tool_command() -> None:
     cmd = parse_fallback_tool_command('{"tool":"calculator","args":{"expression":"3*3"}}')
     assert cmd == {'name': 'calculator', 'arguments': {'expression': '3*3'}}
+
+
+def test_parse_fallback_tool_command_takes_first_balanced_object() -> None:
+    text = 'Calling {"tool":"calculator","args":{"expression":"(1+2)}"}} now. {not json}'
+    cmd = parse_fallback_tool_command(text)
+    assert cmd == {'name': 'calculator', 'arguments': {'expression': '(1+2)}'}}
+    assert parse_fallback_tool_command('no object here {') is None
+
+
+def test_oversized_json_inputs_are_rejected_without_parsing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tools, '_MAX_JSON_LEN', 16)
+    assert json_validate('{"a":1}') == {'valid': True}
+    assert json_validate('{"a":"' + 'x' * 32 + '"}')['valid'] is False
+    assert parse_fallback_tool_command('{"tool":"calculator","args":{}}') is None